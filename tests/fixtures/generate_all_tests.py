@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 """
 Master script to generate all test files for xleak.
-Run: python3 generate_all_tests.py
+Run: python3 generate_all_tests.py [--force]
+Files newer than their generator script are skipped unless --force is given;
+test_tables.xlsx is checked by generate_test_tables.py itself. The check does
+not see generator arguments: after `generate_test_large.py 50000` the 50,000-row
+file is kept, so use --force to get back to the default size.
+Set XLEAK_FIXTURE_DIR=<dir> to write the files to <dir> (relative to the current directory).
 """
 
-import subprocess
+import importlib
 import sys
 import os
+import traceback
+
+# Generators are imported from this directory and write their output here
+FIXTURES_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, FIXTURES_DIR)
 
 def check_dependencies():
     """Check if openpyxl is installed."""
@@ -19,24 +29,39 @@ def check_dependencies():
         print("  Install with: pip install openpyxl")
         return False
 
-def run_generator(script_name, description):
-    """Run a generator script and report status."""
+def is_up_to_date(module_name, output_name):
+    """Check whether the output file is newer than its generator script.
+
+    Only modification times are compared, so a file built standalone with
+    different arguments (e.g. a custom row count) still counts as current.
+    """
+    target = os.path.join(os.environ.get("XLEAK_FIXTURE_DIR", ""), output_name)
+    source = os.path.join(FIXTURES_DIR, f"{module_name}.py")
+    return (os.path.exists(target)
+            and os.path.getmtime(target) >= os.path.getmtime(source))
+
+def run_generator(module_name, description, output_name, force=False, check_mtime=True):
+    """Run a generator module in-process and report status.
+
+    Pass check_mtime=False for generators that decide for themselves whether
+    their output is stale.
+    """
     print(f"{'='*60}")
-    print(f"Running {script_name}...")
+    print(f"Running {module_name}.py...")
     print(f"{'='*60}\n")
 
+    if check_mtime and not force and is_up_to_date(module_name, output_name):
+        print(f"✓ {output_name} is up to date, skipping (use --force to regenerate)\n")
+        return True
+
     try:
-        result = subprocess.run(
-            [sys.executable, script_name],
-            cwd=os.path.dirname(os.path.abspath(__file__)),
-            check=True,
-            capture_output=False
-        )
+        importlib.import_module(module_name).main(["--force"] if force else [])
         print(f"\n✓ {description} generated successfully\n")
         return True
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         print(f"\n✗ Failed to generate {description}")
         print(f"  Error: {e}")
+        traceback.print_exc()
         return False
 
 def main():
@@ -50,25 +75,42 @@ def main():
     if not check_dependencies():
         sys.exit(1)
 
+    # Resolve a relative output directory against the caller's directory, as
+    # the standalone generators do, before moving into this directory
+    out_dir = os.environ.get("XLEAK_FIXTURE_DIR")
+    if out_dir:
+        os.environ["XLEAK_FIXTURE_DIR"] = os.path.abspath(out_dir)
+    os.chdir(FIXTURES_DIR)
+    force = "--force" in sys.argv[1:]
+    # Per-row progress from the generators is noise in a batch run
+    os.environ.setdefault("XLEAK_QUIET", "1")
+
     # Track success
     all_success = True
 
     # Generate comprehensive test file
     all_success &= run_generator(
-        "generate_test_comprehensive.py",
-        "test_comprehensive.xlsx"
+        "generate_test_comprehensive",
+        "comprehensive test file",
+        output_name="test_comprehensive.xlsx",
+        force=force
     )
 
     # Generate large test file
     all_success &= run_generator(
-        "generate_test_large.py",
-        "test_large.xlsx"
+        "generate_test_large",
+        "large test file",
+        output_name="test_large.xlsx",
+        force=force
     )
 
-    # Generate Excel tables test file
+    # Generate Excel tables test file (it compares its own input fingerprint)
     all_success &= run_generator(
-        "generate_test_tables.py",
-        "test_tables.xlsx"
+        "generate_test_tables",
+        "Excel tables test file",
+        output_name="test_tables.xlsx",
+        force=force,
+        check_mtime=False
     )
 
     # Summary
@@ -85,10 +127,11 @@ def main():
         print("⚠️  IMPORTANT:")
         print("  Open test_comprehensive.xlsx in Excel and save it to cache formula results!")
         print()
+        hint_dir = os.environ.get("XLEAK_FIXTURE_DIR") or os.path.join("tests", "fixtures")
         print("Test with:")
-        print("  ./target/release/xleak tests/fixtures/test_comprehensive.xlsx -i")
-        print("  ./target/release/xleak tests/fixtures/test_large.xlsx -i")
-        print("  ./target/release/xleak tests/fixtures/test_tables.xlsx --list-tables")
+        print(f"  ./target/release/xleak {os.path.join(hint_dir, 'test_comprehensive.xlsx')} -i")
+        print(f"  ./target/release/xleak {os.path.join(hint_dir, 'test_large.xlsx')} -i")
+        print(f"  ./target/release/xleak {os.path.join(hint_dir, 'test_tables.xlsx')} --list-tables")
     else:
         print("✗ Some test files failed to generate")
         print("="*60)
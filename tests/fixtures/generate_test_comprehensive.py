@@ -1,10 +1,20 @@
 #!/usr/bin/env python3
 """Generate comprehensive test Excel file with all data types and edge cases."""
 
+import itertools
+import os
+import sys
 import openpyxl
 from datetime import datetime, timedelta
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
 
+def formatted(ws, value, number_format):
+    """Wrap a value in a write-only cell carrying a number format."""
+    cell = WriteOnlyCell(ws, value=value)
+    cell.number_format = number_format
+    return cell
+
 def create_data_types_sheet(wb):
     """Create sheet with all data types."""
     ws = wb.create_sheet("DataTypes")
@@ -23,8 +33,7 @@ def create_data_types_sheet(wb):
     ws.append(["Integer", -273, "Negative integer"])
     ws.append(["Float", 3.14159, "Decimal number"])
     ws.append(["Float", 2.5e10, "Scientific notation"])
-    ws.append(["Percentage", 0.75, "Percentage (75%)"])
-    ws['B9'].number_format = '0%'
+    ws.append(["Percentage", formatted(ws, 0.75, '0%'), "Percentage (75%)"])
 
     # Booleans
     ws.append(["Boolean", True, "TRUE value"])
@@ -34,10 +43,8 @@ def create_data_types_sheet(wb):
     ws.append(["Empty", None, "Empty cell"])
 
     # Currency
-    ws.append(["Currency", 1234.56, "US Dollar"])
-    ws['B13'].number_format = '$#,##0.00'
-    ws.append(["Currency", 9876.54, "Euro"])
-    ws['B14'].number_format = '€#,##0.00'
+    ws.append(["Currency", formatted(ws, 1234.56, '$#,##0.00'), "US Dollar"])
+    ws.append(["Currency", formatted(ws, 9876.54, '€#,##0.00'), "Euro"])
 
     return ws
 
@@ -119,27 +126,30 @@ def create_multiline_cells_sheet(wb):
     # Headers
     ws.append(["Line Count", "Content", "Description"])
 
+    # Format the longest case once; shorter cases are prefixes of it
+    all_lines = [f"Line {i+1}" for i in range(100)]
+
     # 1 line
     ws.append([1, "Single line", "No newlines"])
 
     # 5 lines
-    lines_5 = "\n".join([f"Line {i+1}" for i in range(5)])
+    lines_5 = "\n".join(itertools.islice(all_lines, 5))
     ws.append([5, lines_5, "Short multi-line"])
 
     # 10 lines
-    lines_10 = "\n".join([f"Line {i+1}" for i in range(10)])
+    lines_10 = "\n".join(itertools.islice(all_lines, 10))
     ws.append([10, lines_10, "Medium multi-line"])
 
     # 20 lines (original issue #16 case)
-    lines_20 = "\n".join([f"Line {i+1}" for i in range(20)])
+    lines_20 = "\n".join(itertools.islice(all_lines, 20))
     ws.append([20, lines_20, "Issue #16 test case"])
 
     # 50 lines
-    lines_50 = "\n".join([f"Line {i+1}" for i in range(50)])
+    lines_50 = "\n".join(itertools.islice(all_lines, 50))
     ws.append([50, lines_50, "Large multi-line"])
 
     # 100 lines
-    lines_100 = "\n".join([f"Line {i+1}" for i in range(100)])
+    lines_100 = "\n".join(itertools.islice(all_lines, 100))
     ws.append([100, lines_100, "Very large multi-line"])
 
     # Multi-line with international characters
@@ -159,18 +169,22 @@ def create_date_edge_cases_sheet(wb):
     # Headers
     ws.append(["Description", "Date", "Serial", "Notes"])
 
+    def serial(value):
+        """Format the Serial column as plain numbers."""
+        return formatted(ws, value, '0')
+
     # 1900 era dates (leap year bug zone)
-    ws.append(["First day", datetime(1900, 1, 1), 1, "Excel serial 1"])
-    ws.append(["Late January", datetime(1900, 1, 31), 31, "Before leap bug"])
-    ws.append(["Day before fake leap", datetime(1900, 2, 28), 59, "Serial 59"])
+    ws.append(["First day", datetime(1900, 1, 1), serial(1), "Excel serial 1"])
+    ws.append(["Late January", datetime(1900, 1, 31), serial(31), "Before leap bug"])
+    ws.append(["Day before fake leap", datetime(1900, 2, 28), serial(59), "Serial 59"])
     # Note: Excel allows 1900-02-29 (serial 60) but Python doesn't, so we skip it
-    ws.append(["Day after fake leap", datetime(1900, 3, 1), 61, "Serial 61, leap bug applies"])
+    ws.append(["Day after fake leap", datetime(1900, 3, 1), serial(61), "Serial 61, leap bug applies"])
 
     # Modern dates
-    ws.append(["Y2K", datetime(2000, 1, 1), 36526, "Year 2000"])
-    ws.append(["Real leap day", datetime(2000, 2, 29), 36585, "2000 was a leap year"])
-    ws.append(["Recent date", datetime(2024, 1, 1), 45292, "2024 start"])
-    ws.append(["Today", datetime(2024, 12, 3), 45629, "Current date"])
+    ws.append(["Y2K", datetime(2000, 1, 1), serial(36526), "Year 2000"])
+    ws.append(["Real leap day", datetime(2000, 2, 29), serial(36585), "2000 was a leap year"])
+    ws.append(["Recent date", datetime(2024, 1, 1), serial(45292), "2024 start"])
+    ws.append(["Today", datetime(2024, 12, 3), serial(45629), "Current date"])
 
     # Issue #25 specific dates
     ws.append(["Issue #25 test", datetime(2025, 11, 19, 11, 18, 20), None, "Date from screenshot"])
@@ -181,11 +195,6 @@ def create_date_edge_cases_sheet(wb):
     ws.append(["Midnight", datetime(2024, 6, 15, 0, 0, 0), None, "Time = 00:00:00"])
     ws.append(["Just before midnight", datetime(2024, 6, 15, 23, 59, 59), None, "Time = 23:59:59"])
 
-    # Format serial column as numbers
-    for row in range(2, ws.max_row + 1):
-        if ws.cell(row, 3).value is not None:
-            ws.cell(row, 3).number_format = '0'
-
     return ws
 
 def create_edge_cases_sheet(wb):
@@ -229,13 +238,12 @@ def create_edge_cases_sheet(wb):
 
     return ws
 
-def main():
-    """Generate the comprehensive test file."""
+def main(argv=()):
+    """Generate the comprehensive test file (argv is unused)."""
     print("Generating test_comprehensive.xlsx...")
 
-    # Create workbook
-    wb = openpyxl.Workbook()
-    wb.remove(wb.active)  # Remove default sheet
+    # Create workbook; write-only mode streams rows instead of holding Cell objects
+    wb = openpyxl.Workbook(write_only=True)
 
     # Create all sheets
     print("  Creating DataTypes sheet...")
@@ -257,17 +265,19 @@ def main():
     create_edge_cases_sheet(wb)
 
     # Save file
-    output_path = "test_comprehensive.xlsx"
+    out_dir = os.environ.get("XLEAK_FIXTURE_DIR", "")
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    output_path = os.path.join(out_dir, "test_comprehensive.xlsx")
     wb.save(output_path)
 
     print(f"\n✓ Created {output_path}")
     print("\nSheets:")
     for sheet in wb.sheetnames:
-        ws = wb[sheet]
-        print(f"  - {sheet}: {ws.max_row - 1} data rows")
+        print(f"  - {sheet}")
 
     print("\n⚠️  IMPORTANT: Open this file in Excel and save it to cache formula results!")
     print("   Formulas will show as #NAME? until Excel calculates them.")
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
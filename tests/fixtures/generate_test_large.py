@@ -3,24 +3,32 @@
 Generate large Excel file for testing xleak's lazy loading performance.
 Run: python3 generate_test_large.py [num_rows]
 Default: 10,000 rows
+Set XLEAK_QUIET=1 to suppress per-row progress output.
 """
 
-try:
-    from openpyxl import Workbook
-    import random
-    import time
-except ImportError:
-    print("Please install openpyxl: pip install openpyxl")
-    exit(1)
+import importlib.util
+import os
+import random
+import sys
+import time
+
+if importlib.util.find_spec("openpyxl") is None:
+    sys.exit("Please install openpyxl: pip install openpyxl")
+
+from openpyxl import Workbook
+
+# Fixed seed so regenerated fixtures are identical from run to run
+SEED = 0
 
 def create_large_file(num_rows=10000):
     """Create large test file with specified number of rows."""
     print(f"📊 Generating test_large.xlsx with {num_rows:,} rows...")
     start_time = time.time()
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "LargeData"
+    # Write-only mode streams rows straight to the archive instead of keeping
+    # a Cell object for every value in memory
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("LargeData")
 
     # Headers
     headers = ["ID", "Name", "Email", "Age", "City", "Country", "Salary",
@@ -36,34 +44,66 @@ def create_large_file(num_rows=10000):
     statuses = ["Active", "Inactive", "Pending"]
 
     print("⏳ Generating rows (this may take a minute)...")
+    quiet = os.environ.get("XLEAK_QUIET")
+
+    # Draw each column in one batch instead of a dozen RNG calls per row
+    rng = random.Random(SEED)
+    choices = rng.choices
+    uniform = rng.uniform
+    randint = rng.randint
+    names = [
+        f"{first} {last}"
+        for first, last in zip(choices(first_names, k=num_rows),
+                               choices(last_names, k=num_rows))
+    ]
+    emails = [f"user{i}@example.com" for i in range(1, num_rows + 1)]
+    ages = choices(range(22, 66), k=num_rows)
+    row_cities = choices(cities, k=num_rows)
+    row_countries = choices(countries, k=num_rows)
+    salaries = choices(range(40000, 150001), k=num_rows)
+    row_departments = choices(departments, k=num_rows)
+    row_statuses = choices(statuses, k=num_rows)
+    join_dates = [
+        f"2020-{month:02d}-{day:02d}"
+        for month, day in zip(choices(range(1, 13), k=num_rows),
+                              choices(range(1, 29), k=num_rows))
+    ]
+    scores = [round(uniform(60, 100), 1) for _ in range(num_rows)]
+    ratings = [round(uniform(1, 5), 1) for _ in range(num_rows)]
 
-    for i in range(1, num_rows + 1):
-        if i % 1000 == 0:
+    columns = zip(names, emails, ages, row_cities, row_countries, salaries,
+                  row_departments, row_statuses, join_dates, scores, ratings)
+    for i, (name, email, age, city, country, salary, department, status,
+            join_date, score, rating) in enumerate(columns, 1):
+        if i % 1000 == 0 and not quiet:
             print(f"  Generated {i:,} rows...")
 
-        row_data = [
+        row_data = (
             i,  # ID
-            f"{random.choice(first_names)} {random.choice(last_names)}",  # Name
-            f"user{i}@example.com",  # Email
-            random.randint(22, 65),  # Age
-            random.choice(cities),  # City
-            random.choice(countries),  # Country
-            random.randint(40000, 150000),  # Salary
-            random.choice(departments),  # Department
-            random.choice(statuses),  # Status
-            f"2020-{random.randint(1,12):02d}-{random.randint(1,28):02d}",  # JoinDate
-            round(random.uniform(60, 100), 1),  # Score
-            round(random.uniform(1, 5), 1),  # Rating
-        ]
+            name,  # Name
+            email,  # Email
+            age,  # Age
+            city,  # City
+            country,  # Country
+            salary,  # Salary
+            department,  # Department
+            status,  # Status
+            join_date,  # JoinDate
+            score,  # Score
+            rating,  # Rating
+        )
         ws.append(row_data)
 
     # Create a smaller sheet for comparison and multi-sheet testing
     ws2 = wb.create_sheet("SmallData")
     ws2.append(["Product", "Price", "Stock"])
     for i in range(50):
-        ws2.append([f"Product {i+1}", round(random.uniform(10, 500), 2), random.randint(0, 1000)])
+        ws2.append((f"Product {i+1}", round(uniform(10, 500), 2), randint(0, 1000)))
 
-    filename = "test_large.xlsx"
+    out_dir = os.environ.get("XLEAK_FIXTURE_DIR", "")
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    filename = os.path.join(out_dir, "test_large.xlsx")
     print(f"💾 Saving {filename}...")
     wb.save(filename)
 
@@ -77,17 +117,20 @@ def create_large_file(num_rows=10000):
     print(f"  ./target/release/xleak {filename} -i")
     print(f"  ./target/release/xleak {filename} --sheet LargeData -n 20")
 
-if __name__ == "__main__":
-    import sys
-
-    # Allow custom row count
+def main(argv=()):
+    """Generate test_large.xlsx, taking an optional row count from argv."""
+    # Allow custom row count; --force is accepted since the file is always rebuilt
+    args = [arg for arg in argv if arg != "--force"]
     num_rows = 10000
-    if len(sys.argv) > 1:
+    if args:
         try:
-            num_rows = int(sys.argv[1])
+            num_rows = int(args[0])
         except ValueError:
             print("Usage: python3 generate_test_large.py [num_rows]")
             print("Example: python3 generate_test_large.py 50000")
             sys.exit(1)
 
     create_large_file(num_rows)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,192 +1,197 @@
 #!/usr/bin/env python3
 """
 Generate Excel file with Excel Table structures for testing (issue #18).
-Run: python3 generate_test_tables.py
+Run: python3 generate_test_tables.py [--force]
+Set XLEAK_FIXTURE_FAST=1 to store the archive uncompressed.
+Set XLEAK_VERBOSE=1 to list the generated sheets and tables.
+The file is only rebuilt when this script, openpyxl or the compression mode changes.
 """
 
-try:
-    from openpyxl import Workbook
-    from openpyxl.worksheet.table import Table, TableStyleInfo
-    import random
-except ImportError:
-    print("Please install openpyxl: pip install openpyxl")
-    exit(1)
-
-def create_products_table(wb):
-    """Create sheet with Products table."""
-    ws = wb.create_sheet("ProductsTable")
-
-    # Add data
-    data = [
-        ["ProductID", "ProductName", "Category", "Price", "Stock", "Supplier"],
-        [1001, "Wireless Mouse", "Electronics", 24.99, 150, "TechCorp"],
-        [1002, "USB-C Cable", "Accessories", 9.99, 500, "CableWorld"],
-        [1003, "Laptop Stand", "Accessories", 34.99, 75, "OfficePlus"],
-        [1004, "Mechanical Keyboard", "Electronics", 89.99, 45, "KeyMasters"],
-        [1005, "Webcam HD", "Electronics", 59.99, 120, "TechCorp"],
-        [1006, "Phone Charger", "Accessories", 19.99, 300, "ChargeIt"],
-        [1007, "Monitor Arm", "Office", 79.99, 30, "OfficePlus"],
-        [1008, "Desk Lamp LED", "Office", 44.99, 85, "LightWorks"],
-        [1009, "Cable Organizer", "Accessories", 12.99, 200, "OfficePlus"],
-        [1010, "USB Hub", "Electronics", 29.99, 160, "TechCorp"],
-    ]
-
-    for row in data:
-        ws.append(row)
-
-    # Create table
-    tab = Table(displayName="Products", ref="A1:F11")
-
-    # Add a table style
-    style = TableStyleInfo(
-        name="TableStyleMedium9",
-        showFirstColumn=False,
-        showLastColumn=False,
-        showRowStripes=True,
-        showColumnStripes=False
-    )
-    tab.tableStyleInfo = style
-
-    # Add the table to the worksheet
-    ws.add_table(tab)
-
-    return ws
-
-def create_sales_table(wb):
-    """Create sheet with Sales table including calculated column."""
-    ws = wb.create_sheet("SalesTable")
-
-    # Add data
-    data = [
-        ["OrderID", "ProductID", "Quantity", "UnitPrice", "Total", "OrderDate"],
-        [5001, 1001, 2, 24.99, 49.98, "2024-01-15"],
-        [5002, 1003, 1, 34.99, 34.99, "2024-01-16"],
-        [5003, 1002, 5, 9.99, 49.95, "2024-01-16"],
-        [5004, 1004, 1, 89.99, 89.99, "2024-01-17"],
-        [5005, 1005, 2, 59.99, 119.98, "2024-01-18"],
-        [5006, 1001, 3, 24.99, 74.97, "2024-01-19"],
-        [5007, 1006, 4, 19.99, 79.96, "2024-01-20"],
-        [5008, 1008, 1, 44.99, 44.99, "2024-01-21"],
-        [5009, 1002, 10, 9.99, 99.90, "2024-01-22"],
-        [5010, 1007, 2, 79.99, 159.98, "2024-01-23"],
-    ]
-
-    for row in data:
-        ws.append(row)
-
-    # Create table
-    tab = Table(displayName="Sales", ref="A1:F11")
-
-    # Add a table style
-    style = TableStyleInfo(
-        name="TableStyleMedium2",
-        showFirstColumn=False,
-        showLastColumn=False,
-        showRowStripes=True,
-        showColumnStripes=False
+import hashlib
+import importlib.util
+import os
+import random
+import sys
+from datetime import date, datetime, timezone
+from zipfile import BadZipFile, ZipFile, ZIP_STORED
+
+if importlib.util.find_spec("openpyxl") is None:
+    sys.exit("Please install openpyxl: pip install openpyxl")
+
+from openpyxl import Workbook, load_workbook, __version__ as openpyxl_version
+from openpyxl.packaging.custom import StringProperty
+from openpyxl.utils import get_column_letter
+from openpyxl.writer.excel import ExcelWriter
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+
+SEED = 0
+
+# Custom document property recording the inputs a file was generated from
+FINGERPRINT_PROPERTY = "xleak_fixture_fingerprint"
+
+def input_fingerprint():
+    """Hash everything that affects the generated file."""
+    with open(os.path.abspath(__file__), "rb") as f:
+        digest = hashlib.sha256(f.read())
+    digest.update(openpyxl_version.encode())
+    digest.update(b"stored" if os.environ.get("XLEAK_FIXTURE_FAST") else b"deflated")
+    return digest.hexdigest()
+
+def is_up_to_date(filename, fingerprint):
+    """Check whether an existing file was generated from the same inputs."""
+    if not os.path.exists(filename):
+        return False
+    try:
+        wb = load_workbook(filename, read_only=True)
+    except (BadZipFile, KeyError, OSError):
+        # Truncated or foreign file: rebuild it
+        return False
+    try:
+        return any(p.name == FINGERPRINT_PROPERTY and p.value == fingerprint
+                   for p in wb.custom_doc_props)
+    finally:
+        wb.close()
+
+# Display options shared by every table; only the style name varies
+TABLE_STYLE_OPTIONS = dict(
+    showFirstColumn=False,
+    showLastColumn=False,
+    showRowStripes=True,
+    showColumnStripes=False,
+)
+
+def make_table(display_name, ref, header):
+    """Create a table with explicit columns (write-only sheets can't read the header back)."""
+    return Table(
+        displayName=display_name,
+        ref=ref,
+        autoFilter=AutoFilter(ref=ref),
+        tableColumns=[TableColumn(id=i, name=name) for i, name in enumerate(header, 1)],
     )
-    tab.tableStyleInfo = style
-
-    # Add the table to the worksheet
-    ws.add_table(tab)
-
-    return ws
-
-def create_employees_table(wb):
-    """Create sheet with Employees table."""
-    ws = wb.create_sheet("EmployeesTable")
 
-    # Add data
+PRODUCTS = [
+    ["ProductID", "ProductName", "Category", "Price", "Stock", "Supplier"],
+    [1001, "Wireless Mouse", "Electronics", 24.99, 150, "TechCorp"],
+    [1002, "USB-C Cable", "Accessories", 9.99, 500, "CableWorld"],
+    [1003, "Laptop Stand", "Accessories", 34.99, 75, "OfficePlus"],
+    [1004, "Mechanical Keyboard", "Electronics", 89.99, 45, "KeyMasters"],
+    [1005, "Webcam HD", "Electronics", 59.99, 120, "TechCorp"],
+    [1006, "Phone Charger", "Accessories", 19.99, 300, "ChargeIt"],
+    [1007, "Monitor Arm", "Office", 79.99, 30, "OfficePlus"],
+    [1008, "Desk Lamp LED", "Office", 44.99, 85, "LightWorks"],
+    [1009, "Cable Organizer", "Accessories", 12.99, 200, "OfficePlus"],
+    [1010, "USB Hub", "Electronics", 29.99, 160, "TechCorp"],
+]
+
+SALES = [
+    ["OrderID", "ProductID", "Quantity", "UnitPrice", "Total", "OrderDate"],
+    [5001, 1001, 2, 24.99, 49.98, "2024-01-15"],
+    [5002, 1003, 1, 34.99, 34.99, "2024-01-16"],
+    [5003, 1002, 5, 9.99, 49.95, "2024-01-16"],
+    [5004, 1004, 1, 89.99, 89.99, "2024-01-17"],
+    [5005, 1005, 2, 59.99, 119.98, "2024-01-18"],
+    [5006, 1001, 3, 24.99, 74.97, "2024-01-19"],
+    [5007, 1006, 4, 19.99, 79.96, "2024-01-20"],
+    [5008, 1008, 1, 44.99, 44.99, "2024-01-21"],
+    [5009, 1002, 10, 9.99, 99.90, "2024-01-22"],
+    [5010, 1007, 2, 79.99, 159.98, "2024-01-23"],
+]
+
+REGIONAL_SALES = [
+    ["Region", "Q1 Sales", "Q2 Sales", "Q3 Sales", "Q4 Sales"],
+    ["North", 125000, 132000, 145000, 158000],
+    ["South", 98000, 105000, 112000, 121000],
+    ["East", 156000, 162000, 175000, 188000],
+    ["West", 187000, 195000, 208000, 221000],
+]
+
+def employees_rows(rng):
+    """Yield the Employees rows (header first) from random picks."""
     first_names = ["Alice", "Bob", "Carol", "David", "Emma", "Frank", "Grace", "Henry"]
     last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis"]
     departments = ["Engineering", "Sales", "Marketing", "HR", "Finance"]
 
-    data = [["EmpID", "FirstName", "LastName", "Department", "Salary", "HireDate"]]
-
-    for i in range(1, 16):
-        data.append([
-            2000 + i,
-            random.choice(first_names),
-            random.choice(last_names),
-            random.choice(departments),
-            random.randint(50000, 120000),
-            f"20{random.randint(18,24)}-{random.randint(1,12):02d}-{random.randint(1,28):02d}"
-        ])
-
-    for row in data:
-        ws.append(row)
-
-    # Create table
-    tab = Table(displayName="Employees", ref="A1:F16")
-
-    # Add a table style
-    style = TableStyleInfo(
-        name="TableStyleLight11",
-        showFirstColumn=False,
-        showLastColumn=False,
-        showRowStripes=True,
-        showColumnStripes=False
+    yield ["EmpID", "FirstName", "LastName", "Department", "Salary", "HireDate"]
+
+    # Draw each column in one batch rather than several RNG calls per row
+    num_rows = 15
+    columns = zip(
+        rng.choices(first_names, k=num_rows),
+        rng.choices(last_names, k=num_rows),
+        rng.choices(departments, k=num_rows),
+        rng.choices(range(50000, 120001), k=num_rows),
+        rng.choices(range(2018, 2025), k=num_rows),
+        rng.choices(range(1, 13), k=num_rows),
+        rng.choices(range(1, 29), k=num_rows),
     )
-    tab.tableStyleInfo = style
-
-    # Add the table to the worksheet
-    ws.add_table(tab)
-
-    return ws
-
-def create_unformatted_data(wb):
-    """Create sheet with regular range (non-table) for comparison."""
-    ws = wb.create_sheet("UnformattedData")
-
-    # Add regular data without table formatting
-    data = [
-        ["Region", "Q1 Sales", "Q2 Sales", "Q3 Sales", "Q4 Sales"],
-        ["North", 125000, 132000, 145000, 158000],
-        ["South", 98000, 105000, 112000, 121000],
-        ["East", 156000, 162000, 175000, 188000],
-        ["West", 187000, 195000, 208000, 221000],
-    ]
-
-    for row in data:
-        ws.append(row)
-
-    return ws
-
-def main():
-    """Generate the Excel tables test file."""
-    print("Generating test_tables.xlsx...")
+    for i, (first, last, department, salary, year, month, day) in enumerate(columns, 1):
+        yield [2000 + i, first, last, department, salary, date(year, month, day).isoformat()]
+
+def main(argv=()):
+    """Generate the Excel tables test file unless it is already up to date."""
+    out_dir = os.environ.get("XLEAK_FIXTURE_DIR", "")
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    filename = os.path.join(out_dir, "test_tables.xlsx")
+    fingerprint = input_fingerprint()
+    if "--force" not in argv and is_up_to_date(filename, fingerprint):
+        print(f"✓ {filename} is up to date, skipping (use --force to regenerate)")
+        return
+
+    print(f"Generating {filename}...")
 
     # Create workbook
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove default sheet
-
-    # Create sheets with tables
-    print("  Creating ProductsTable...")
-    create_products_table(wb)
-
-    print("  Creating SalesTable...")
-    create_sales_table(wb)
-
-    print("  Creating EmployeesTable...")
-    create_employees_table(wb)
+    wb = Workbook(write_only=True)
+    wb.custom_doc_props.append(StringProperty(name=FINGERPRINT_PROPERTY, value=fingerprint))
+    rng = random.Random(SEED)
+
+    # (sheet name, row iterable with header first, table name, table style)
+    sheets = [
+        ("ProductsTable", PRODUCTS, "Products", "TableStyleMedium9"),
+        ("SalesTable", SALES, "Sales", "TableStyleMedium2"),
+        ("EmployeesTable", employees_rows(rng), "Employees", "TableStyleLight11"),
+        # Regular range (non-table) for comparison
+        ("UnformattedData", REGIONAL_SALES, None, None),
+    ]
 
-    print("  Creating UnformattedData (comparison)...")
-    create_unformatted_data(wb)
+    for sheet_name, rows, table_name, style_name in sheets:
+        print(f"  Creating {sheet_name}...")
+        ws = wb.create_sheet(sheet_name)
+        # Rows are streamed, so count them on the way through for the table ref
+        rows = iter(rows)
+        header = next(rows)
+        ws.append(header)
+        last_row = 1
+        for last_row, row in enumerate(rows, 2):
+            ws.append(row)
+
+        if table_name:
+            ref = f"A1:{get_column_letter(len(header))}{last_row}"
+            tab = make_table(table_name, ref, header)
+            tab.tableStyleInfo = TableStyleInfo(name=style_name, **TABLE_STYLE_OPTIONS)
+            ws.tables.add(tab)
 
     # Save file
-    filename = "test_tables.xlsx"
-    wb.save(filename)
+    if os.environ.get("XLEAK_FIXTURE_FAST"):
+        # Deflating a file this small costs more CPU than the bytes it saves;
+        # these are save_workbook()'s steps with ZIP_STORED instead of ZIP_DEFLATED
+        with ZipFile(filename, "w", ZIP_STORED, allowZip64=True) as archive:
+            wb.properties.modified = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+            ExcelWriter(wb, archive).save()
+    else:
+        wb.save(filename)
 
     print(f"\n✓ Created {filename}")
-    print("\nSheets:")
-    for sheet in wb.sheetnames:
-        ws = wb[sheet]
-        tables = ws.tables
-        if tables:
-            table_names = [t.displayName for t in tables.values()]
-            print(f"  - {sheet}: {ws.max_row - 1} data rows, table: {', '.join(table_names)}")
-        else:
-            print(f"  - {sheet}: {ws.max_row - 1} data rows (no table)")
+    if os.environ.get("XLEAK_VERBOSE"):
+        print("\nSheets:")
+        for ws in wb.worksheets:
+            tables = ws.tables
+            if tables:
+                table_names = [f"{t.displayName} ({t.ref})" for t in tables.values()]
+                print(f"  - {ws.title}: table {', '.join(table_names)}")
+            else:
+                print(f"  - {ws.title}: no table")
 
     print("\nTest with:")
     print(f"  ./target/release/xleak {filename} -i")
@@ -194,4 +199,4 @@ def main():
     print(f"  ./target/release/xleak {filename} --table Products")
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])